@@ -20,6 +20,14 @@ from src.tv_agent import create_tv_agent
 def run_agent(agent_func, host="0.0.0.0", port=18000):
     """개별 에이전트 실행 함수"""
     try:
+        # 에이전트는 전부 async I/O이므로 가능하면 uvloop 이벤트 루프 사용
+        # (자식 프로세스에서 루프 생성 전에 설치해야 uvicorn이 이를 사용)
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+
         print(f"Starting agent on port {port}")
         app = agent_func()
         uvicorn.run(app, host=host, port=port, log_level="warning")
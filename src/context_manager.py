@@ -7,7 +7,7 @@ import json
 import uuid
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from src.llm_client import LLMClient
 import logging
 
@@ -286,7 +286,6 @@ JSON 형식으로 응답해주세요:
     
     def cleanup_old_sessions(self, max_age_hours: int = 24):
         """오래된 세션들 정리"""
-        from datetime import timedelta
         cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
         
         sessions_to_remove = []
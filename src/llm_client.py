@@ -147,6 +147,66 @@ class AzureLLMClient:
             logger.error("=" * 80 + "\n")
             raise
     
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]] = None,
+        system_prompt: str = None,
+        user_prompt: str = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ):
+        """
+        Azure OpenAI Chat Completion 스트리밍 호출
+
+        토큰이 도착하는 대로 델타 문자열을 yield하는 async generator.
+        전체 응답 완료를 기다리지 않고 부분 텍스트를 바로 내보낼 수 있어
+        첫 토큰까지의 체감 지연을 줄인다.
+
+        Args:
+            messages: 메시지 리스트 (선택사항)
+            system_prompt: 시스템 프롬프트 (선택사항)
+            user_prompt: 사용자 프롬프트 (선택사항)
+            temperature: 응답의 창의성 (0.0-1.0)
+            max_tokens: 최대 토큰 수
+
+        Yields:
+            LLM 응답 델타 텍스트
+        """
+        # 메시지 구성 방식 결정 (chat_completion과 동일)
+        if messages is not None:
+            final_messages = messages
+        elif system_prompt or user_prompt:
+            final_messages = []
+            if system_prompt:
+                final_messages.append({"role": "system", "content": system_prompt})
+            if user_prompt:
+                final_messages.append({"role": "user", "content": user_prompt})
+        else:
+            raise ValueError("messages 또는 system_prompt/user_prompt 중 하나는 제공되어야 합니다.")
+
+        logger.info(f"🤖 LLM 스트리밍 호출 시작 (messages: {len(final_messages)})")
+
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.deployment_name,
+                messages=final_messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+
+            async for chunk in stream:
+                if chunk.choices:
+                    delta = chunk.choices[0].delta
+                    if delta and delta.content:
+                        yield delta.content
+
+            logger.info("🤖 LLM 스트리밍 호출 완료")
+
+        except Exception as e:
+            logger.error(f"❌ Azure OpenAI 스트리밍 호출 실패: {e}")
+            raise
+
     async def get_intent_classification(self, user_input: str, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
         """의도 분류 요청"""
         messages = [
@@ -297,5 +357,63 @@ class AzureLLMClient:
             }
 
 
+class LLMBatcher:
+    """동시에 들어온 LLM 요청을 짧은 시간 창 안에서 모아 한꺼번에 전송하는 마이크로 배처
+
+    개별 요청 처리 코루틴이 각자 chat_completion을 await하는 대신,
+    window 초 동안 쌓인 요청을 asyncio.gather로 동시 제출해
+    LLM 백엔드의 배치 처리를 활용한다. 에이전트별 executor가
+    자신의 클라이언트로 인스턴스를 만들어 공유한다.
+    """
+
+    def __init__(self, client, window: float = 0.05):
+        self.client = client
+        self.window = window
+        self._pending = []
+        self._flush_task = None
+        # 전송 중인 배치 태스크 참조 (GC로 태스크가 사라지지 않도록 유지)
+        self._inflight = set()
+
+    async def submit(self, **kwargs) -> str:
+        """요청을 큐에 넣고 배치 결과를 기다림"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((kwargs, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self):
+        """window 초 단위로 쌓인 요청을 배치로 전송
+
+        전송 자체는 별도 태스크로 분리해 수집 루프가 이전 배치의
+        완료를 기다리며 멈추지 않게 한다. (수집 루프가 gather를 직접
+        await하면 그 동안 submit된 요청이 다음 submit이 올 때까지
+        방치되는 문제가 있었음) 남은 요청이 없으면 루프를 끝내고,
+        이후 submit이 새 수집 태스크를 시작한다.
+        """
+        while self._pending:
+            await asyncio.sleep(self.window)
+            if not self._pending:
+                break
+            batch, self._pending = self._pending, []
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch):
+        """배치를 동시 제출하고 각 future에 결과 전달"""
+        results = await asyncio.gather(
+            *[self.client.chat_completion(**kwargs) for kwargs, _ in batch],
+            return_exceptions=True
+        )
+        for (_, future), result in zip(batch, results):
+            if future.cancelled():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
 # LLMClient alias for backward compatibility
 LLMClient = AzureLLMClient 
\ No newline at end of file
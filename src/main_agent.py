@@ -4,6 +4,7 @@ Main Agent - A2A 프로토콜 기반 오케스트레이션 에이전트
 Registry 기능 통합
 """
 import asyncio
+import re
 import uuid
 import json
 import traceback
@@ -72,7 +73,6 @@ class AgentRegistry:
                 return False
             
             # URL에서 포트 번호를 추출하여 agent_id로 사용
-            import re
             port_match = re.search(r':(\d+)', url)
             if port_match:
                 port = port_match.group(1)
@@ -340,7 +340,8 @@ class MainAgentExecutor(AgentExecutor):
                 print("❌ Parts가 없음")
                 return ""
             
-            user_text = ""
+            # 문자열 누적 대신 리스트에 모아 한 번에 join (멀티파트 메시지에서 O(N) 유지)
+            parts_text = []
             for i, part in enumerate(parts):
                 print(f"📝 Part {i+1} 처리 중...")
                 
@@ -352,7 +353,7 @@ class MainAgentExecutor(AgentExecutor):
                             text_value = getattr(root, 'text')
                             print(f"  ✅ root.text 발견: '{text_value}'")
                             if text_value:
-                                user_text += str(text_value)
+                                parts_text.append(str(text_value))
                                 continue
                 except Exception as e:
                     print(f"  ❌ root.text 접근 실패: {e}")
@@ -367,7 +368,7 @@ class MainAgentExecutor(AgentExecutor):
                                 text_value = root_data['text']
                                 print(f"  ✅ model_dump에서 text 발견: '{text_value}'")
                                 if text_value:
-                                    user_text += str(text_value)
+                                    parts_text.append(str(text_value))
                                     continue
                 except Exception as e:
                     print(f"  ❌ model_dump 접근 실패: {e}")
@@ -379,12 +380,12 @@ class MainAgentExecutor(AgentExecutor):
                             attr_value = getattr(part, attr_name)
                             print(f"  Part.{attr_name}: '{attr_value}'")
                             if attr_value:
-                                user_text += str(attr_value)
+                                parts_text.append(str(attr_value))
                                 break
                 except Exception as e:
                     print(f"  ❌ 직접 속성 탐색 실패: {e}")
             
-            user_text = user_text.strip()
+            user_text = "".join(parts_text).strip()
             print(f"✅ 최종 추출된 텍스트: '{user_text}'")
             return user_text
             
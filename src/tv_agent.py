@@ -4,33 +4,106 @@ TV Agent - TV 제어 전담 에이전트
 A2A 프로토콜 기반으로 Main Agent Registry에 자동 등록
 """
 import asyncio
-import uuid
+import os
+import re
 import json
 import httpx
+from collections import OrderedDict
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events.event_queue import EventQueue
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import (
-    AgentCard, AgentSkill, Message, TextPart, Role
+    AgentCard, AgentSkill, Message, Part, TextPart, Role
 )
-from src.llm_client import LLMClient
+from src.llm_client import LLMClient, LLMBatcher
 from src.prompt_loader import PromptLoader
 from src.extended_agent_card import ExtendedAgentSkill, EntityTypeInfo
 import logging
 
 logger = logging.getLogger(__name__)
 
+# LLM 응답 파싱은 가능하면 orjson(C 구현 파서) 사용, 미설치 환경에서는 표준 json으로 대체
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# messageId 생성용 난수 풀
+# 응답마다 uuid4()가 os.urandom(16) 시스템 콜을 호출하는 대신
+# 한 번에 크게 읽어와 16바이트씩 잘라 사용 (단일 이벤트 루프 내 접근이라 락 불필요)
+_RAND_POOL = bytearray()
+_RAND_POOL_REFILL = 16 * 256
+
+# LLM 호출 최대 대기 시간 (초) - 업스트림 지연 시 코루틴이 무한정 묶이지 않도록 제한
+_LLM_TIMEOUT = 10.0
+
+# (액션, 매개변수, TV 상태) 조합별 응답 LRU 캐시 최대 크기
+_RESP_CACHE_MAX = 512
+
+# _analyze_tv_action 키워드 매칭용 사전 컴파일 정규식
+# 호출마다 리스트 리터럴을 만들어 파이썬 루프로 부분 문자열을 찾는 대신
+# C 수준의 단일 스캔으로 처리
+_POWER_ON_RE = re.compile("켜|on|전원 켜")
+_POWER_OFF_RE = re.compile("꺼|off|전원 꺼")
+_VOLUME_RE = re.compile("볼륨|volume")
+_UP_RE = re.compile("올려|up|크게|키워")
+_DOWN_RE = re.compile("내려|down|작게|줄여")
+_CHANNEL_RE = re.compile("채널|channel|방송")
+_CH_CHANGE_RE = re.compile("바꿔|변경|돌려|적절한|어울리는")
+_CH_UP_RE = re.compile("올려|다음")
+_CH_DOWN_RE = re.compile("내려|이전")
+_INPUT_RE = re.compile("hdmi|입력|소스")
+_MUTE_RE = re.compile("음소거|mute|조용히")
+
+# 액션 키워드에 등장하는 모든 글자 집합
+# 이 중 한 글자도 없는 입력은 정규식 분류기를 돌릴 필요가 없음
+_ACTION_CHARS = frozenset(
+    "".join((
+        "켜", "꺼", "전원", "볼륨", "volume", "올려", "up", "크게", "키워",
+        "내려", "down", "작게", "줄여", "채널", "channel", "방송", "바꿔",
+        "변경", "돌려", "적절한", "어울리는", "다음", "이전", "hdmi", "입력",
+        "소스", "음소거", "mute", "조용히", "on", "off", "0123456789",
+    ))
+)
+
+
+def _new_message_id() -> str:
+    """uuid4().hex 형태의 메시지 ID 생성 (난수 풀 기반)"""
+    if len(_RAND_POOL) < 16:
+        _RAND_POOL.extend(os.urandom(_RAND_POOL_REFILL))
+    token = bytes(_RAND_POOL[-16:])
+    del _RAND_POOL[-16:]
+    return token.hex()
+
+
 class TVAgentExecutor(AgentExecutor):
     """TV 에이전트 실행자"""
-    
+
+    # 인스턴스 속성 집합을 고정해 속성 접근을 슬롯 기반으로, 인스턴스 메모리를 축소
+    __slots__ = (
+        "llm_client",
+        "prompt_loader",
+        "_llm_batcher",
+        "_prompt_data",
+        "_system_msg",
+        "_resp_cache",
+    )
+
     def __init__(self):
         """초기화"""
         print("📺 TVAgentExecutor 초기화...")
         try:
             self.llm_client = LLMClient()
             self.prompt_loader = PromptLoader("prompt")
+            self._llm_batcher = LLMBatcher(self.llm_client)
+            # 프롬프트는 런타임에 변하지 않으므로 시스템 메시지 dict를 한 번만 구성해 재사용
+            self._prompt_data = self.prompt_loader.load_prompt("tv_agent", "tv_control")
+            self._system_msg = {"role": "system", "content": self._prompt_data["system_prompt"]}
+            # (액션, 매개변수, 상태) 조합은 유한하므로 LLM 응답을 LRU 캐시로 재사용
+            self._resp_cache: "OrderedDict[tuple, str]" = OrderedDict()
             print("✅ TVAgentExecutor 초기화 완료")
         except Exception as e:
             print(f"❌ TVAgentExecutor 초기화 실패: {e}")
@@ -44,9 +117,16 @@ class TVAgentExecutor(AgentExecutor):
         print("=" * 50)
         
         try:
+            # 0. 메시지가 아예 없는 요청(헬스체크/프로브 등)은 추출 코루틴 진입 없이 바로 응답
+            message = getattr(context, 'message', None)
+            if message is None or not getattr(message, 'parts', None):
+                print("❌ 메시지 없음 - 기본 안내 응답")
+                await self._send_response(context, queue, "안녕하세요! TV 제어를 도와드릴 수 있습니다.")
+                return
+
             # 1. 사용자 메시지 추출
             user_text = await self._extract_user_message(context)
-            
+
             if not user_text:
                 print("❌ 메시지 추출 실패")
                 await self._send_response(context, queue, "안녕하세요! TV 제어를 도와드릴 수 있습니다.")
@@ -74,29 +154,33 @@ class TVAgentExecutor(AgentExecutor):
         print("🔍 메시지 추출 중...")
         
         try:
-            message = getattr(context, 'message', None)
-            if not message:
+            # RequestContext/Message는 필드가 정해진 Pydantic 모델이므로
+            # getattr/hasattr 체인 대신 직접 접근하고 AttributeError만 처리
+            try:
+                parts = context.message.parts
+            except AttributeError:
                 return ""
-            
-            parts = getattr(message, 'parts', None)
             if not parts:
                 return ""
-            
-            user_text = ""
+
+            # 문자열 누적 대신 리스트에 모아 한 번에 join (멀티파트 메시지에서 O(N) 유지)
+            chunks = []
             for part in parts:
-                # 텍스트 추출 시도
-                if hasattr(part, 'root') and hasattr(part.root, 'text'):
-                    text_value = getattr(part.root, 'text')
-                    if text_value:
-                        user_text += str(text_value)
-                elif hasattr(part, 'model_dump'):
-                    part_dict = part.model_dump()
-                    if 'root' in part_dict and isinstance(part_dict['root'], dict):
-                        if 'text' in part_dict['root']:
-                            user_text += str(part_dict['root']['text'])
-                            
-            return user_text.strip()
-            
+                # 정상 경로: TextPart의 root.text 직접 접근
+                try:
+                    text_value = part.root.text
+                except AttributeError:
+                    # 비정형 파트만 model_dump 경로로 처리
+                    text_value = None
+                    if hasattr(part, 'model_dump'):
+                        part_root = part.model_dump().get('root')
+                        if isinstance(part_root, dict):
+                            text_value = part_root.get('text')
+                if text_value:
+                    chunks.append(str(text_value))
+
+            return ''.join(chunks).strip()
+
         except Exception as e:
             print(f"❌ 메시지 추출 실패: {e}")
             return ""
@@ -147,19 +231,21 @@ class TVAgentExecutor(AgentExecutor):
 
 위의 다른 에이전트 결과들을 참고하여 적절한 TV 제어를 수행하고 자연스러운 응답을 생성해주세요."""
 
-            response = await self.llm_client.chat_completion(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                max_tokens=400,
-                response_format={"type": "json_object"}
+            response = await asyncio.wait_for(
+                self._llm_batcher.submit(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    max_tokens=400,
+                    response_format={"type": "json_object"}
+                ),
+                timeout=_LLM_TIMEOUT
             )
             
             # JSON 응답 파싱
             try:
-                import json
-                result = json.loads(response.strip())
+                result = _json_loads(response.strip())
                 return result.get("response", "TV 제어를 완료했습니다.")
-            except json.JSONDecodeError:
+            except ValueError:
                 print(f"❌ JSON 파싱 실패, 원본 응답 사용: {response}")
                 return response.strip()
                 
@@ -171,7 +257,9 @@ class TVAgentExecutor(AgentExecutor):
     async def _process_simple_tv_request(self, user_text: str) -> str:
         """단순 TV 제어 요청 처리"""
         print("📺 단순 TV 제어 처리")
-        
+
+        # 액션 분석 자체가 실패해도 백업 응답 경로에서 참조할 수 있도록 기본값 유지
+        action_info = {"action_type": "unknown", "parameters": {}}
         try:
             # TV 액션 분석
             action_info = self._analyze_tv_action(user_text)
@@ -235,7 +323,6 @@ class TVAgentExecutor(AgentExecutor):
                     break
             
             if context_json:
-                import json
                 return json.loads(context_json)
                 
         except Exception as e:
@@ -246,12 +333,28 @@ class TVAgentExecutor(AgentExecutor):
     async def _generate_simple_tv_response(self, action_info: dict, user_text: str) -> str:
         """단순 TV 제어를 위한 LLM 응답 생성"""
         try:
-            prompt_data = self.prompt_loader.load_prompt("tv_agent", "tv_control")
-            
+            prompt_data = self._prompt_data
+
             # 시뮬레이션된 현재 TV 상태
             current_channel = 1
             current_volume = 20
-            
+
+            # 동일한 (액션, 매개변수, 상태) 요청은 LLM 호출 없이 캐시 응답 재사용
+            # 단, unknown은 프롬프트가 발화 원문에 좌우되어 이 키로는
+            # 응답이 결정되지 않으므로 (서로 다른 발화가 한 키로 합쳐짐) 캐시 제외
+            cacheable = action_info["action_type"] != "unknown"
+            cache_key = (
+                action_info["action_type"],
+                tuple(sorted(action_info.get("parameters", {}).items())),
+                current_channel,
+                current_volume
+            )
+            cached_response = self._resp_cache.get(cache_key) if cacheable else None
+            if cached_response is not None:
+                self._resp_cache.move_to_end(cache_key)
+                print(f"💾 캐시된 TV 응답 사용: {cache_key[0]}")
+                return cached_response
+
             formatted_prompt = prompt_data["user_prompt_template"].format(
                 original_request=user_text,
                 action=action_info["action_type"],
@@ -260,10 +363,12 @@ class TVAgentExecutor(AgentExecutor):
                 current_volume=current_volume
             )
             
-            response = await self.llm_client.chat_completion(
-                system_prompt=prompt_data["system_prompt"],
-                user_prompt=formatted_prompt,
-                max_tokens=300
+            response = await asyncio.wait_for(
+                self._llm_batcher.submit(
+                    messages=[self._system_msg, {"role": "user", "content": formatted_prompt}],
+                    max_tokens=300
+                ),
+                timeout=_LLM_TIMEOUT
             )
             
             # JSON 응답 파싱 시도
@@ -275,78 +380,97 @@ class TVAgentExecutor(AgentExecutor):
                     response_clean = response_clean[:-3]
                 response_clean = response_clean.strip()
                 
-                parsed_response = json.loads(response_clean)
-                return parsed_response.get("response", response_clean)
-                
-            except json.JSONDecodeError:
+                parsed_response = _json_loads(response_clean)
+                result_text = parsed_response.get("response", response_clean)
+
+            except ValueError:
                 print(f"⚠️ JSON 파싱 실패, 원본 응답 사용: {response}")
-                return response.strip()
-            
+                result_text = response.strip()
+
+            # 성공 응답을 캐시에 저장하고 오래된 항목부터 제거
+            if cacheable:
+                self._resp_cache[cache_key] = result_text
+                if len(self._resp_cache) > _RESP_CACHE_MAX:
+                    self._resp_cache.popitem(last=False)
+            return result_text
+
+        except asyncio.TimeoutError:
+            print(f"⏰ LLM 응답 시간 초과 ({_LLM_TIMEOUT}초), 백업 응답 사용")
+            return self._generate_fallback_tv_response(action_info["action_type"], action_info.get("parameters", {}))
         except Exception as e:
             print(f"❌ 단순 TV 응답 생성 실패: {e}")
             return self._generate_fallback_tv_response(action_info["action_type"], action_info.get("parameters", {}))
 
     def _analyze_tv_action(self, user_text: str) -> dict:
         """TV 액션 분석"""
-        user_lower = user_text.lower()
-        
         action_info = {
             "action_type": "unknown",
             "parameters": {},
             "device": "main_tv"
         }
-        
+
+        # 빈 입력은 분류기 진입 전에 바로 반환
+        # (길이 기반 차단은 "켜"/"꺼" 같은 한 글자 명령을 놓치므로
+        #  비명령 잡음 걸러내기는 아래 글자 집합 검사에 맡긴다)
+        if not user_text:
+            return action_info
+
+        user_lower = user_text.lower()
+
+        # 액션 관련 글자가 하나도 없으면 키워드 스캔 전체를 생략
+        if not any(c in _ACTION_CHARS for c in user_lower):
+            return action_info
+
         # 전원 제어
-        if any(word in user_lower for word in ["켜", "on", "전원 켜"]):
+        if _POWER_ON_RE.search(user_lower):
             action_info["action_type"] = "power_on"
-        elif any(word in user_lower for word in ["꺼", "off", "전원 꺼"]):
+        elif _POWER_OFF_RE.search(user_lower):
             action_info["action_type"] = "power_off"
-        
+
         # 볼륨 제어
-        elif any(word in user_lower for word in ["볼륨", "volume"]):
-            if any(word in user_lower for word in ["올려", "up", "크게", "키워"]):
+        elif _VOLUME_RE.search(user_lower):
+            if _UP_RE.search(user_lower):
                 action_info["action_type"] = "volume_up"
                 # 숫자 추출 시도
                 volume_level = self._extract_volume_level(user_text)
                 if volume_level:
                     action_info["parameters"]["level"] = volume_level
-            elif any(word in user_lower for word in ["내려", "down", "작게", "줄여"]):
+            elif _DOWN_RE.search(user_lower):
                 action_info["action_type"] = "volume_down"
                 volume_level = self._extract_volume_level(user_text)
                 if volume_level:
                     action_info["parameters"]["level"] = volume_level
             else:
                 action_info["action_type"] = "volume_control"
-        
+
         # 채널 제어
-        elif any(word in user_lower for word in ["채널", "channel", "방송"]):
-            if any(word in user_lower for word in ["바꿔", "변경", "돌려", "적절한", "어울리는"]):
+        elif _CHANNEL_RE.search(user_lower):
+            if _CH_CHANGE_RE.search(user_lower):
                 action_info["action_type"] = "channel_control"
                 channel_num = self._extract_channel_number(user_text)
                 if channel_num:
                     action_info["parameters"]["channel"] = channel_num
-            elif any(word in user_lower for word in ["올려", "다음"]):
+            elif _CH_UP_RE.search(user_lower):
                 action_info["action_type"] = "channel_up"
-            elif any(word in user_lower for word in ["내려", "이전"]):
+            elif _CH_DOWN_RE.search(user_lower):
                 action_info["action_type"] = "channel_down"
-        
+
         # 입력 소스 변경
-        elif any(word in user_lower for word in ["hdmi", "입력", "소스"]):
+        elif _INPUT_RE.search(user_lower):
             action_info["action_type"] = "input_change"
             if "hdmi" in user_lower:
                 hdmi_num = self._extract_hdmi_number(user_text)
                 if hdmi_num:
                     action_info["parameters"]["input"] = f"HDMI{hdmi_num}"
-        
+
         # 음소거
-        elif any(word in user_lower for word in ["음소거", "mute", "조용히"]):
+        elif _MUTE_RE.search(user_lower):
             action_info["action_type"] = "mute_toggle"
-        
+
         return action_info
 
     def _extract_volume_level(self, text: str) -> int:
         """볼륨 레벨 추출"""
-        import re
         numbers = re.findall(r'\b(\d+)\b', text)
         if numbers:
             level = int(numbers[0])
@@ -355,7 +479,6 @@ class TVAgentExecutor(AgentExecutor):
 
     def _extract_channel_number(self, text: str) -> int:
         """채널 번호 추출"""
-        import re
         numbers = re.findall(r'\b(\d+)\b', text)
         if numbers:
             return int(numbers[0])
@@ -363,7 +486,6 @@ class TVAgentExecutor(AgentExecutor):
 
     def _extract_hdmi_number(self, text: str) -> int:
         """HDMI 번호 추출"""
-        import re
         hdmi_match = re.search(r'hdmi\s*(\d+)', text.lower())
         if hdmi_match:
             return int(hdmi_match.group(1))
@@ -396,10 +518,14 @@ class TVAgentExecutor(AgentExecutor):
         print(f"📤 응답 전송: '{text}'")
         
         try:
-            response_message = Message(
-                messageId=str(uuid.uuid4()),
+            # 필드 값이 모두 내부에서 만들어진 신뢰 가능한 상수/문자열이므로
+            # model_construct로 Pydantic 검증을 생략하고 바로 조립
+            response_message = Message.model_construct(
+                messageId=_new_message_id(),
                 role=Role.agent,
-                parts=[TextPart(kind='text', text=text)],
+                # 검증 시 coercion이 만들어 주던 Part 루트 모델 래핑을 직접 수행
+                # (parts 스키마는 list[Part]이고 수신 측은 part.root.text로 접근)
+                parts=[Part.model_construct(root=TextPart.model_construct(kind='text', text=text))],
                 contextId=context.context_id,
                 taskId=context.task_id
             )
@@ -4,9 +4,16 @@ Weather Agent - 날씨 정보 제공 전담 에이전트
 A2A 프로토콜 기반으로 Main Agent Registry에 자동 등록
 """
 import asyncio
-import uuid
+import functools
+import hashlib
+import os
+import random
+import re
+import time
 import json
 import httpx
+from collections import OrderedDict
+from types import MappingProxyType
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events.event_queue import EventQueue
 from a2a.server.apps import A2AStarletteApplication
@@ -15,44 +22,197 @@ from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import (
     AgentCard, AgentSkill, Message, TextPart, Role
 )
-from src.llm_client import LLMClient
+from src.llm_client import LLMClient, LLMBatcher
 from src.prompt_loader import PromptLoader
 from src.extended_agent_card import ExtendedAgentSkill, EntityTypeInfo
 import logging
 
 logger = logging.getLogger(__name__)
 
+# JSON 인코딩은 가능하면 orjson(C 구현) 사용, 미설치 환경에서는 표준 json으로 대체
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        # orjson은 UTF-8 bytes를 바로 출력하므로 ensure_ascii 처리가 필요 없음
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+# 컨텍스트 프롬프트 섹션 캐시 최대 크기
+_CTX_SECTION_CACHE_MAX = 128
+
+# (컨텍스트 해시 묶음, 사용자 질의) -> 합성 응답 캐시 최대 크기
+_CTX_RESPONSE_CACHE_MAX = 128
+
+# messageId 생성용 난수 풀
+# 응답마다 uuid4()가 os.urandom(16) 시스템 콜을 호출하는 대신
+# 한 번에 크게 읽어와 16바이트씩 잘라 사용 (단일 이벤트 루프 내 접근이라 락 불필요)
+_RAND_POOL = bytearray()
+_RAND_POOL_REFILL = 16 * 256
+
+# 공유 httpx 클라이언트 연결 풀 설정
+# 동시 요청이 몰려도 연결 수립 대기 없이 keepalive 연결을 재사용할 수 있는 크기
+_HTTP_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# LLM 호출 최대 대기 시간 (초) - 업스트림 지연 시 코루틴이 무한정 묶이지 않도록 제한
+_LLM_TIMEOUT = 10.0
+
+# 단순 날씨 응답 캐시 설정 - 동일 질의가 짧은 간격으로 반복되면 LLM 호출 생략
+_SIMPLE_CACHE_TTL = 300.0  # 초
+_SIMPLE_CACHE_MAX = 512
+
+# model_dump 기반 파트 파싱 폴백 사용 여부 (기동 시 1회 결정)
+# A2A TextPart는 항상 .root.text를 노출하므로 기본 경로는 속성 접근만 사용하고,
+# 비표준 파트까지 전체 직렬화로 긁어야 하는 환경에서만 플래그로 켠다
+_MODEL_DUMP_FALLBACK = bool(os.environ.get("A2A_STRICT_PARSE"))
+
+# [AGENT_CONTEXT] 마커 뒤 JSON 블록의 시작 위치를 찾는 정규식
+# 닫는 괄호를 정규식으로 찾으면 중첩 괄호나 꼬리 텍스트의 괄호에서
+# 경계가 틀어지므로, 경계 확정은 아래 디코더의 raw_decode에 맡긴다
+_CTX_RE = re.compile(r'\[AGENT_CONTEXT\]\s*(?=[\[\{])')
+
+# 시작 위치부터 JSON 값 하나만 정확히 파싱하고 꼬리 텍스트는 무시
+_CTX_DECODER = json.JSONDecoder()
+
+# LLM 응답을 감싼 선행/후행 코드 펜스와 공백을 한 번의 매칭으로 제거
+# (startswith/endswith + 슬라이스 + strip 체인 대신 C 수준 단일 스캔)
+_JSON_FENCE = re.compile(r"^\s*(?:```(?:json)?\s*)?(.*?)(?:\s*```)?\s*$", re.DOTALL)
+
+# 주요 도시/시간 키워드 테이블 (정규화 값 -> 매칭 키워드 튜플)
+# 요청마다 dict/list 리터럴을 새로 만들지 않도록 모듈 로드 시 한 번만 구성
+_CITIES = {
+    "서울": ("서울", "seoul"),
+    "부산": ("부산", "busan"),
+    "대구": ("대구", "daegu"),
+    "인천": ("인천", "incheon"),
+    "광주": ("광주", "gwangju"),
+    "대전": ("대전", "daejeon"),
+    "울산": ("울산", "ulsan"),
+    "제주": ("제주", "jeju"),
+}
+
+# 키워드 매칭용 소문자 변환 테이블
+# 키워드가 ASCII 영문과 한글(대소문자 개념 없음)뿐이므로
+# 유니코드 전체를 처리하는 str.lower() 대신 A-Z만 치환한다
+_LOWER_TABLE = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+_TIME_KEYWORDS = {
+    "오늘": ("오늘", "today"),
+    "내일": ("내일", "tomorrow"),
+    "모레": ("모레",),
+    "이번주": ("이번주", "this week"),
+    "다음주": ("다음주", "next week"),
+}
+
+
+def _new_message_id() -> str:
+    """uuid4().hex 형태의 메시지 ID 생성 (난수 풀 기반)"""
+    if len(_RAND_POOL) < 16:
+        _RAND_POOL.extend(os.urandom(_RAND_POOL_REFILL))
+    token = bytes(_RAND_POOL[-16:])
+    del _RAND_POOL[-16:]
+    return token.hex()
+
+
+def _build_entity_matcher():
+    """도시/시간 키워드를 하나로 합친 (단일 스캔 정규식, 키워드->(분류, 정규화 값)) 생성
+
+    분류별로 따로 스캔하지 않고 입력을 한 번만 훑으면서
+    위치와 시간 키워드를 동시에 찾기 위한 통합 매처.
+    """
+    canon = {}
+    for name, keywords in _CITIES.items():
+        for keyword in keywords:
+            canon[keyword] = ("loc", name)
+    for name, keywords in _TIME_KEYWORDS.items():
+        for keyword in keywords:
+            canon[keyword] = ("time", name)
+    return re.compile("|".join(canon)), canon
+
+
+_ENTITY_RE, _ENTITY_CANON = _build_entity_matcher()
+
+# 위치별 시뮬레이션 날씨 데이터 (실제로는 외부 API 연동)
+# 읽기 전용 프록시로 감싸 모듈 로드 시 한 번만 구성
+_WEATHER_DATA = MappingProxyType({
+    "서울": {"temp": 22, "condition": "맑음", "humidity": 60, "wind_speed": 8, "uv_index": 5},
+    "부산": {"temp": 25, "condition": "구름조금", "humidity": 65, "wind_speed": 12, "uv_index": 6},
+    "대구": {"temp": 24, "condition": "맑음", "humidity": 55, "wind_speed": 6, "uv_index": 5},
+    "인천": {"temp": 21, "condition": "흐림", "humidity": 70, "wind_speed": 10, "uv_index": 3},
+    "광주": {"temp": 26, "condition": "맑음", "humidity": 58, "wind_speed": 7, "uv_index": 6},
+    "대전": {"temp": 23, "condition": "구름조금", "humidity": 62, "wind_speed": 9, "uv_index": 4},
+    "울산": {"temp": 25, "condition": "맑음", "humidity": 63, "wind_speed": 11, "uv_index": 5},
+    "제주": {"temp": 28, "condition": "맑음", "humidity": 72, "wind_speed": 15, "uv_index": 7},
+})
+
+
+@functools.lru_cache(maxsize=64)
+def _fallback_weather_response(location: str, time_info: str) -> str:
+    """백업 날씨 응답 생성
+
+    도시 x 시간 조합이 유한하고 날씨 테이블이 정적이므로
+    같은 조합의 포맷 결과는 lru_cache가 재사용한다.
+    """
+    weather_data = _WEATHER_DATA.get(location, _WEATHER_DATA["서울"])
+    return f"🌤️ {location}의 {time_info} 날씨는 {weather_data['condition']}이고, 기온은 {weather_data['temp']}도, 습도는 {weather_data['humidity']}% 입니다."
+
+
 class WeatherAgentExecutor(AgentExecutor):
     """날씨 에이전트 실행자"""
     
     def __init__(self):
         """초기화"""
-        print("🌤️ WeatherAgentExecutor 초기화...")
+        logger.info("🌤️ WeatherAgentExecutor 초기화...")
         try:
             self.llm_client = LLMClient()
+            # 동시 요청의 LLM 호출을 짧은 창 안에서 모아 동시 제출
+            self._llm_batcher = LLMBatcher(self.llm_client)
             self.prompt_loader = PromptLoader("prompt")
-            print("✅ WeatherAgentExecutor 초기화 완료")
+            # 앱 lifespan이 관리하는 공유 httpx 클라이언트 (startup에서 주입됨)
+            # 실제 날씨 API 연동 시 _fetch_weather_data가 이 클라이언트를 사용
+            self.http_client = None
+            # 프롬프트는 런타임에 변하지 않으므로 초기화 시 한 번만 로드
+            self._weather_prompt = self.prompt_loader.load_prompt("weather_agent", "weather_response")
+            # 요청마다 dict 조회를 반복하지 않도록 고정 필드는 미리 꺼내 바인딩
+            self._weather_system_prompt = self._weather_prompt["system_prompt"]
+            # 템플릿 format 바운드 메서드도 미리 묶어 호출 지점의 조회 비용 제거
+            self._format_weather_prompt = self._weather_prompt["user_prompt_template"].format
+            # (위치, 시간) 정규화 키 -> (저장 시각, 응답) TTL 캐시
+            self._simple_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+            # 컨텍스트 dict 해시 -> 포맷된 프롬프트 섹션 캐시 (멀티턴 반복 직렬화 방지)
+            self._ctx_section_cache: "OrderedDict[bytes, str]" = OrderedDict()
+            # (컨텍스트 해시 묶음, 질의) -> 합성 응답 캐시 (전부 기시감 있는 입력이면 LLM 생략)
+            self._ctx_response_cache: "OrderedDict[tuple, str]" = OrderedDict()
+            logger.info("✅ WeatherAgentExecutor 초기화 완료")
         except Exception as e:
-            print(f"❌ WeatherAgentExecutor 초기화 실패: {e}")
+            logger.error("❌ WeatherAgentExecutor 초기화 실패: %s", e)
             raise
 
     async def execute(self, context: RequestContext, queue: EventQueue) -> None:
         """메시지 실행 처리"""
         
-        print("\n" + "=" * 50)
-        print("🌤️ WEATHER AGENT 실행 시작")
-        print("=" * 50)
+        # 배너는 INFO가 꺼져 있으면 문자열 생성 자체를 생략
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("=" * 50)
+            logger.info("🌤️ WEATHER AGENT 실행 시작")
+            logger.info("=" * 50)
         
         try:
             # 1. 사용자 메시지 추출
             user_text = await self._extract_user_message(context)
             
             if not user_text:
-                print("❌ 메시지 추출 실패")
+                logger.debug("❌ 메시지 추출 실패")
                 await self._send_response(context, queue, "안녕하세요! 날씨 정보를 도와드릴 수 있습니다.")
                 return
             
-            print(f"✅ 추출된 메시지: '{user_text}'")
+            logger.debug("✅ 추출된 메시지: '%s'", user_text)
             
             # 2. Agent 컨텍스트 정보 추출
             agent_contexts = self._extract_agent_contexts(user_text)
@@ -60,18 +220,18 @@ class WeatherAgentExecutor(AgentExecutor):
             # 3. 날씨 정보 처리
             response_text = await self._process_weather_request(user_text, agent_contexts)
             
-            # 3. 응답 전송
+            # 4. 응답 전송
             await self._send_response(context, queue, response_text)
             
-            print("✅ 날씨 정보 처리 완료!")
+            logger.info("✅ 날씨 정보 처리 완료!")
             
         except Exception as e:
-            print(f"❌ 오류 발생: {e}")
+            logger.error("❌ 오류 발생: %s", e)
             await self._send_response(context, queue, f"날씨 정보 처리 중 오류가 발생했습니다: {str(e)}")
 
     async def _extract_user_message(self, context: RequestContext) -> str:
         """사용자 메시지 추출"""
-        print("🔍 메시지 추출 중...")
+        logger.debug("🔍 메시지 추출 중...")
         
         try:
             message = getattr(context, 'message', None)
@@ -82,33 +242,35 @@ class WeatherAgentExecutor(AgentExecutor):
             if not parts:
                 return ""
             
-            user_text = ""
+            # 문자열 누적 대신 리스트에 모아 한 번에 join (멀티파트 메시지에서 O(N) 유지)
+            parts_text = []
             for part in parts:
-                # 텍스트 추출 시도
-                if hasattr(part, 'root') and hasattr(part.root, 'text'):
-                    text_value = getattr(part.root, 'text')
-                    if text_value:
-                        user_text += str(text_value)
-                elif hasattr(part, 'model_dump'):
+                # hasattr 선검사 없이 속성 경로를 한 번에 시도
+                # (성공 경로는 속성 접근 2회, 비싼 model_dump 경로는 아예 타지 않음)
+                text_value = getattr(getattr(part, 'root', None), 'text', None)
+                if text_value:
+                    parts_text.append(str(text_value))
+                elif _MODEL_DUMP_FALLBACK and hasattr(part, 'model_dump'):
+                    # 전체 pydantic 직렬화는 비싸므로 플래그를 켠 경우에만 수행
                     part_dict = part.model_dump()
                     if 'root' in part_dict and isinstance(part_dict['root'], dict):
                         if 'text' in part_dict['root']:
-                            user_text += str(part_dict['root']['text'])
-                            
-            return user_text.strip()
+                            parts_text.append(str(part_dict['root']['text']))
+
+            return "".join(parts_text).strip()
             
         except Exception as e:
-            print(f"❌ 메시지 추출 실패: {e}")
+            logger.error("❌ 메시지 추출 실패: %s", e)
             return ""
 
     async def _process_weather_request(self, user_text: str, agent_contexts: list = None) -> str:
         """날씨 요청 처리 - Agent Card 기반 동적 맥락 이해"""
-        print(f"🌤️ 날씨 요청 분석 중: '{user_text}'")
+        logger.debug("🌤️ 날씨 요청 분석 중: '%s'", user_text)
         
         try:
             # 다른 Agent 결과가 있으면 LLM으로 동적 해석
             if agent_contexts:
-                print(f"🔄 다른 Agent 컨텍스트 감지: {len(agent_contexts)}개")
+                logger.debug("🔄 다른 Agent 컨텍스트 감지: %d개", len(agent_contexts))
                 result = await self._process_weather_request_with_context(user_text, agent_contexts)
             else:
                 # 단순 날씨 정보 요청
@@ -117,14 +279,29 @@ class WeatherAgentExecutor(AgentExecutor):
             return result
             
         except Exception as e:
-            print(f"❌ 날씨 요청 처리 실패: {e}")
+            logger.error("❌ 날씨 요청 처리 실패: %s", e)
             return f"죄송합니다. 날씨 정보를 처리하는 중 오류가 발생했습니다."
     
     async def _process_weather_request_with_context(self, user_text: str, agent_contexts: list) -> str:
         """LLM을 사용해 다른 Agent 결과를 동적으로 해석하여 날씨 정보 제공"""
-        print("🤖 LLM 기반 동적 컨텍스트 처리 시작")
+        logger.debug("🤖 LLM 기반 동적 컨텍스트 처리 시작")
         
         try:
+            # 동일한 (컨텍스트 묶음, 질의) 조합이 반복되면 LLM 호출 없이 이전 합성 응답 재사용
+            # 컨텍스트 해시는 내용 기반이라 실행 결과가 바뀌면 자연히 캐시 미스가 된다
+            cache_key = (
+                tuple(
+                    hashlib.blake2b(_json_dumps(ctx).encode(), digest_size=16).digest()
+                    for ctx in agent_contexts
+                ),
+                user_text,
+            )
+            cached_response = self._ctx_response_cache.get(cache_key)
+            if cached_response is not None:
+                self._ctx_response_cache.move_to_end(cache_key)
+                logger.debug("💾 캐시된 컨텍스트 합성 응답 사용")
+                return cached_response
+
             # Agent 컨텍스트를 LLM 프롬프트로 구성
             context_prompt = self._build_agent_context_prompt(agent_contexts)
             
@@ -136,62 +313,81 @@ class WeatherAgentExecutor(AgentExecutor):
 
 {context_prompt}
 
-응답은 반드시 JSON 형태로 제공해주세요:
-{{
-    "location_analysis": "위치 정보 분석",
-    "context_integration": "다른 Agent 결과를 어떻게 활용할지",
-    "weather_data": {{
-        "condition": "날씨 상태",
-        "temperature": "온도",
-        "humidity": "습도"
-    }},
-    "response": "사용자에게 전달할 최종 응답"
-}}"""
+사용자에게 바로 전달할 최종 응답 문장만 자연스러운 텍스트로 출력하세요.
+JSON이나 코드 블록 형식은 사용하지 마세요."""
 
             user_prompt = f"""사용자 요청: "{user_text}"
 
 위의 다른 에이전트 결과들을 참고하여 적절한 날씨 정보를 제공하고 자연스러운 응답을 생성해주세요."""
 
-            response = await self.llm_client.chat_completion(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                max_tokens=400,
-                response_format={"type": "json_object"}
+            # 평문 응답만 소비하므로 JSON 모드를 켜지 않음
+            # (JSON 래핑은 출력 토큰을 늘리고 파싱 비용만 추가)
+            response = await asyncio.wait_for(
+                self._llm_batcher.submit(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    max_tokens=400
+                ),
+                timeout=_LLM_TIMEOUT
             )
-            
-            # JSON 응답 파싱
-            try:
-                import json
-                result = json.loads(response.strip())
-                return result.get("response", "날씨 정보를 제공했습니다.")
-            except json.JSONDecodeError:
-                print(f"❌ JSON 파싱 실패, 원본 응답 사용: {response}")
-                return response.strip()
-                
+
+            parsed = self._parse_llm_json(response, "날씨 정보를 처리했습니다.")
+
+            # 성공 응답만 캐시에 저장, 오래된 항목부터 제거
+            self._ctx_response_cache[cache_key] = parsed
+            if len(self._ctx_response_cache) > _CTX_RESPONSE_CACHE_MAX:
+                self._ctx_response_cache.popitem(last=False)
+            return parsed
+
+        except asyncio.TimeoutError:
+            logger.error("❌ LLM 컨텍스트 처리 시간 초과 (%s초)", _LLM_TIMEOUT)
+            # 백업으로 단순 처리
+            return await self._process_simple_weather_request(user_text)
         except Exception as e:
-            print(f"❌ LLM 컨텍스트 처리 실패: {e}")
+            logger.error("❌ LLM 컨텍스트 처리 실패: %s", e)
             # 백업으로 단순 처리
             return await self._process_simple_weather_request(user_text)
 
     async def _process_simple_weather_request(self, user_text: str) -> str:
         """단순 날씨 정보 요청 처리"""
-        print("🌤️ 단순 날씨 정보 처리")
-        
+        logger.debug("🌤️ 단순 날씨 정보 처리")
+
         try:
-            # 지역 및 시간 정보 추출
-            location = self._extract_location(user_text)
-            time_info = self._extract_time_info(user_text)
-            
-            print(f"📍 추출된 위치: {location}")
-            print(f"🕐 추출된 시간: {time_info}")
-            
+            user_lower = user_text.translate(_LOWER_TABLE)
+
+            # 지역 및 시간 정보 추출 (입력 1회 스캔)
+            location, time_info = self._extract_entities(user_lower)
+
+            logger.debug("📍 추출된 위치: %s", location)
+            logger.debug("🕐 추출된 시간: %s", time_info)
+
+            # 추출된 정규화 키워드를 캐시 키로 사용 - 표현이 달라도
+            # 같은 (위치, 시간) 질의면 TTL 내에는 LLM 호출 없이 재사용
+            cache_key = (location, time_info)
+            cached = self._simple_cache.get(cache_key)
+            if cached is not None:
+                cached_at, cached_response = cached
+                if time.monotonic() - cached_at < _SIMPLE_CACHE_TTL:
+                    self._simple_cache.move_to_end(cache_key)
+                    logger.debug("💾 캐시된 날씨 응답 사용")
+                    return cached_response
+                del self._simple_cache[cache_key]
+
+            # 날씨 데이터 조회 (외부 API 연동 시 이 await 지점이 실제 I/O가 됨)
+            weather_data = await self._fetch_weather_data(location)
+
             # LLM을 사용한 자연스러운 날씨 응답 생성
-            response = await self._generate_weather_response(user_text, location, time_info)
+            response = await self._generate_weather_response(user_text, location, time_info, weather_data)
+
+            # 성공 응답만 캐시에 저장, 오래된 항목부터 제거
+            self._simple_cache[cache_key] = (time.monotonic(), response)
+            if len(self._simple_cache) > _SIMPLE_CACHE_MAX:
+                self._simple_cache.popitem(last=False)
             return response
             
         except Exception as e:
-            print(f"❌ 단순 날씨 처리 실패: {e}")
-            return self._generate_fallback_weather_response(location, time_info)
+            logger.error("❌ 단순 날씨 처리 실패: %s", e)
+            return _fallback_weather_response(location, time_info)
 
     def _build_agent_context_prompt(self, agent_contexts: list) -> str:
         """Agent Card 정보를 LLM이 이해할 수 있는 프롬프트로 변환"""
@@ -200,106 +396,70 @@ class WeatherAgentExecutor(AgentExecutor):
             return "다른 에이전트 실행 결과가 없습니다."
         
         context_sections = []
-        
+
         for context in agent_contexts:
-            agent_card = context.get("source_agent_card", {})
-            result = context.get("execution_result", {})
-            
-            section = f"""
+            # 동일 컨텍스트가 멀티턴에서 반복되면 직렬화/포맷 결과를 재사용
+            cache_key = hashlib.blake2b(
+                _json_dumps(context).encode(), digest_size=16
+            ).digest()
+            section = self._ctx_section_cache.get(cache_key)
+
+            if section is None:
+                agent_card = context.get("source_agent_card", {})
+                result = context.get("execution_result", {})
+
+                section = f"""
 [{agent_card.get('name', 'Unknown Agent')} 정보]
-- Skills: {json.dumps(agent_card.get('skills', []), ensure_ascii=False)}
-- Extended Skills: {json.dumps(agent_card.get('extended_skills', []), ensure_ascii=False)}
-- 실행 결과: {json.dumps(result, ensure_ascii=False)}
+- Skills: {_json_dumps(agent_card.get('skills', []))}
+- Extended Skills: {_json_dumps(agent_card.get('extended_skills', []))}
+- 실행 결과: {_json_dumps(result)}
 """
+                self._ctx_section_cache[cache_key] = section
+                if len(self._ctx_section_cache) > _CTX_SECTION_CACHE_MAX:
+                    self._ctx_section_cache.popitem(last=False)
+            else:
+                self._ctx_section_cache.move_to_end(cache_key)
+
             context_sections.append(section)
-        
+
         return "\n".join(context_sections)
 
     def _extract_agent_contexts(self, user_text: str) -> list:
         """메시지에서 Agent 컨텍스트 정보 추출"""
         try:
-            # [AGENT_CONTEXT] 섹션이 있는지 확인
-            if "[AGENT_CONTEXT]" not in user_text:
-                return []
-            
-            # JSON 형태의 컨텍스트 정보 추출
-            lines = user_text.split('\n')
-            in_context_section = False
-            context_json = ""
-            
-            for line in lines:
-                if "[AGENT_CONTEXT]" in line:
-                    in_context_section = True
-                    continue
-                elif in_context_section and line.strip():
-                    if line.strip().startswith('[') or line.strip().startswith('{'):
-                        context_json += line.strip()
-                    elif context_json and (line.strip().endswith(']') or line.strip().endswith('}')):
-                        context_json += line.strip()
-                        break
-                    elif context_json:
-                        context_json += line.strip()
-                elif in_context_section and line.strip() == "":
-                    break
-            
-            if context_json:
-                import json
-                return json.loads(context_json)
-                
+            match = _CTX_RE.search(user_text)
+            if match:
+                contexts, _ = _CTX_DECODER.raw_decode(user_text, match.end())
+                return contexts
+
         except Exception as e:
-            print(f"⚠️ Agent 컨텍스트 추출 실패: {e}")
-        
+            logger.warning("⚠️ Agent 컨텍스트 추출 실패: %s", e)
+
         return []
 
-    def _extract_location(self, user_text: str) -> str:
-        """지역 정보 추출"""
-        user_lower = user_text.lower()
-        
-        # 주요 도시 목록
-        cities = {
-            "서울": ["서울", "seoul"],
-            "부산": ["부산", "busan"],
-            "대구": ["대구", "daegu"],
-            "인천": ["인천", "incheon"],
-            "광주": ["광주", "gwangju"],
-            "대전": ["대전", "daejeon"],
-            "울산": ["울산", "ulsan"],
-            "제주": ["제주", "jeju"]
-        }
-        
-        for city, keywords in cities.items():
-            if any(keyword in user_lower for keyword in keywords):
-                return city
-                
-        return "서울"  # 기본값
-
-    def _extract_time_info(self, user_text: str) -> str:
-        """시간 정보 추출"""
-        user_lower = user_text.lower()
-        
-        time_keywords = {
-            "오늘": ["오늘", "today"],
-            "내일": ["내일", "tomorrow"],
-            "모레": ["모레"],
-            "이번주": ["이번주", "this week"],
-            "다음주": ["다음주", "next week"]
-        }
-        
-        for time_info, keywords in time_keywords.items():
-            if any(keyword in user_lower for keyword in keywords):
-                return time_info
-                
-        return "오늘"  # 기본값
+    def _extract_entities(self, user_lower: str) -> tuple:
+        """지역/시간 정보를 통합 매처로 한 번에 추출
 
-    async def _generate_weather_response(self, user_text: str, location: str, time_info: str) -> str:
+        호출자가 소문자화한 입력을 한 번만 훑으면서 분류별 첫 매칭을
+        채택한다. 매칭이 없으면 기본값 (서울, 오늘)을 반환.
+        """
+        location = None
+        time_info = None
+        for match in _ENTITY_RE.finditer(user_lower):
+            category, canonical = _ENTITY_CANON[match.group(0)]
+            if category == "loc":
+                if location is None:
+                    location = canonical
+            elif time_info is None:
+                time_info = canonical
+            if location is not None and time_info is not None:
+                break
+        return location or "서울", time_info or "오늘"  # 기본값
+
+    async def _generate_weather_response(self, user_text: str, location: str, time_info: str, weather_data: dict) -> str:
         """LLM을 사용한 자연스러운 날씨 응답 생성"""
         try:
-            prompt_data = self.prompt_loader.load_prompt("weather_agent", "weather_response")
-            
-            # 백업 날씨 데이터 생성 (실제로는 외부 API에서 가져올 데이터)
-            weather_data = self._get_weather_data(location)
-            
-            formatted_prompt = prompt_data["user_prompt_template"].format(
+            formatted_prompt = self._format_weather_prompt(
                 original_request=user_text,  # 프롬프트 파일의 변수명에 맞춤
                 location=location,
                 time_context=time_info,  # 프롬프트 파일의 변수명에 맞춤
@@ -310,55 +470,65 @@ class WeatherAgentExecutor(AgentExecutor):
                 uv_index=weather_data.get("uv_index", 3)
             )
             
-            response = await self.llm_client.chat_completion(
-                system_prompt=prompt_data["system_prompt"],
-                user_prompt=formatted_prompt,
-                max_tokens=300,
-                response_format={"type": "json_object"}
+            # 응답에서 실제로 쓰는 것은 사용자 전달 문장 하나뿐이므로 평문으로 받음
+            response = await asyncio.wait_for(
+                self._llm_batcher.submit(
+                    system_prompt=self._weather_system_prompt,
+                    user_prompt=formatted_prompt,
+                    max_tokens=300
+                ),
+                timeout=_LLM_TIMEOUT
             )
-            
-            # JSON 응답 파싱
-            try:
-                import json
-                result = json.loads(response.strip())
-                return result.get("response", "날씨 정보를 처리했습니다.")
-            except json.JSONDecodeError:
-                print(f"❌ JSON 파싱 실패, 원본 응답 사용: {response}")
-                return response.strip()
-            
+
+            return self._parse_llm_json(response, "날씨 정보를 처리했습니다.")
+
+        except asyncio.TimeoutError:
+            logger.error("❌ LLM 날씨 응답 생성 시간 초과 (%s초)", _LLM_TIMEOUT)
+            return _fallback_weather_response(location, time_info)
         except Exception as e:
-            print(f"❌ LLM 날씨 응답 생성 실패: {e}")
+            logger.error("❌ LLM 날씨 응답 생성 실패: %s", e)
             raise
 
-    def _generate_fallback_weather_response(self, location: str, time_info: str) -> str:
-        """백업 날씨 응답 생성"""
-        weather_data = self._get_weather_data(location)
-        
-        return f"🌤️ {location}의 {time_info} 날씨는 {weather_data['condition']}이고, 기온은 {weather_data['temp']}도, 습도는 {weather_data['humidity']}% 입니다."
+    def _parse_llm_json(self, response: str, default: str) -> str:
+        """LLM 응답에서 사용자 전달 문장 추출 (방어적 JSON 복구 포함)
+
+        평문 응답이 정상 경로이지만, 모델이 간헐적으로 지시를 무시하고
+        JSON이나 코드 블록으로 감싸 응답하는 경우가 있어 두 LLM 경로가
+        공유하는 이 지점에서 한 번만 복구 처리한다.
+        """
+        # 코드 블록 펜스와 앞뒤 공백을 단일 정규식 매칭으로 제거
+        text = _JSON_FENCE.match(response).group(1)
+
+        # JSON 객체로 감싸진 경우 response 필드만 추출
+        if text.startswith("{"):
+            try:
+                result = _json_loads(text)
+                if isinstance(result, dict):
+                    return str(result.get("response", default))
+            except ValueError:
+                pass
+
+        return text or default
+
+    async def _fetch_weather_data(self, location: str) -> dict:
+        """위치별 날씨 데이터 비동기 조회
+
+        현재는 시뮬레이션 테이블을 그대로 반환하지만, 실제 외부 날씨 API가
+        연결되면 이 지점이 HTTP 호출(여러 엔드포인트는 asyncio.gather)로 바뀐다.
+        """
+        return self._get_weather_data(location)
 
     def _get_weather_data(self, location: str) -> dict:
         """위치별 날씨 데이터 조회 (테스트용 시뮬레이션)"""
-        # 테스트용 고정 응답 (실제로는 외부 API 연동)
-        weather_data = {
-            "서울": {"temp": 22, "condition": "맑음", "humidity": 60, "wind_speed": 8, "uv_index": 5},
-            "부산": {"temp": 25, "condition": "구름조금", "humidity": 65, "wind_speed": 12, "uv_index": 6},
-            "대구": {"temp": 24, "condition": "맑음", "humidity": 55, "wind_speed": 6, "uv_index": 5},
-            "인천": {"temp": 21, "condition": "흐림", "humidity": 70, "wind_speed": 10, "uv_index": 3},
-            "광주": {"temp": 26, "condition": "맑음", "humidity": 58, "wind_speed": 7, "uv_index": 6},
-            "대전": {"temp": 23, "condition": "구름조금", "humidity": 62, "wind_speed": 9, "uv_index": 4},
-            "울산": {"temp": 25, "condition": "맑음", "humidity": 63, "wind_speed": 11, "uv_index": 5},
-            "제주": {"temp": 28, "condition": "맑음", "humidity": 72, "wind_speed": 15, "uv_index": 7}
-        }
-        
-        return weather_data.get(location, weather_data["서울"])
+        return _WEATHER_DATA.get(location, _WEATHER_DATA["서울"])
 
     async def _send_response(self, context: RequestContext, queue: EventQueue, text: str):
         """응답 전송"""
-        print(f"📤 응답 전송: '{text}'")
+        logger.debug("📤 응답 전송: '%s'", text)
         
         try:
             response_message = Message(
-                messageId=str(uuid.uuid4()),
+                messageId=_new_message_id(),
                 role=Role.agent,
                 parts=[TextPart(kind='text', text=text)],
                 contextId=context.context_id,
@@ -366,89 +536,145 @@ class WeatherAgentExecutor(AgentExecutor):
             )
             
             await queue.enqueue_event(response_message)
-            print("✅ 응답 전송 완료")
+            logger.debug("✅ 응답 전송 완료")
             
         except Exception as e:
-            print(f"❌ 응답 전송 중 오류: {e}")
+            logger.error("❌ 응답 전송 중 오류: %s", e)
 
     async def cancel(self, context: RequestContext) -> None:
         """실행 취소"""
-        print("🛑 Cancel 호출됨")
+        logger.info("🛑 Cancel 호출됨")
 
 
-async def register_to_main_agent(agent_card: dict, main_agent_url: str = "http://localhost:18000") -> bool:
-    """Main Agent Registry에 HTTP API를 통해 등록 (재시도 메커니즘 포함)"""
-    print(f"📝 Main Agent Registry에 Weather Agent 등록 중...")
-    
+async def register_to_main_agent(
+    agent_card: dict,
+    main_agent_url: str = "http://localhost:18000",
+    client: httpx.AsyncClient = None
+) -> bool:
+    """Main Agent Registry에 HTTP API를 통해 등록 (재시도 메커니즘 포함)
+
+    client가 주어지면 앱 lifespan이 관리하는 공유 클라이언트를 재사용하고,
+    없으면 등록 동안만 쓸 클라이언트를 자체 생성한다.
+    """
+    logger.info("📝 Main Agent Registry에 Weather Agent 등록 중...")
+
+    if client is not None:
+        return await _register_with_client(client, agent_card, main_agent_url)
+
+    # 클라이언트를 재시도 루프 밖에서 한 번만 만들어 연결 풀을 재사용
+    # (시도마다 TCP 연결을 새로 맺고 끊는 비용 제거)
+    async with httpx.AsyncClient(
+        timeout=10.0,
+        limits=_HTTP_POOL_LIMITS
+    ) as owned_client:
+        return await _register_with_client(owned_client, agent_card, main_agent_url)
+
+
+async def _register_with_client(client: httpx.AsyncClient, agent_card: dict, main_agent_url: str) -> bool:
+    """주어진 클라이언트로 등록 재시도 루프 수행"""
     max_retries = 5
-    retry_delay = 2  # 초
-    
+    retry_delay = 2  # 초 (기본값, 재시도마다 지수적으로 증가)
+
+    # 등록 본문은 불변이므로 루프 밖에서 한 번만 직렬화
+    # (json= 인자는 httpx 내부에서 표준 json.dumps를 매 시도 호출)
+    payload = _json_dumps(agent_card)
+
     for attempt in range(max_retries):
+        # 지수 백오프 + 지터로 Main Agent 기동 직후 동시 재시도 몰림 방지
+        backoff = retry_delay * (2 ** attempt) + random.uniform(0, 1)
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{main_agent_url}/api/registry/register",
-                    headers={"Content-Type": "application/json"},
-                    json=agent_card
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("success"):
-                        print("✅ Weather Agent Registry 등록 완료")
-                        return True
-                    else:
-                        print(f"❌ Weather Agent Registry 등록 실패: {result.get('message', 'Unknown error')}")
-                        return False
+            response = await client.post(
+                f"{main_agent_url}/api/registry/register",
+                headers={"Content-Type": "application/json"},
+                content=payload
+            )
+
+            if response.status_code == 200:
+                result = response.json()
+                if result.get("success"):
+                    logger.info("✅ Weather Agent Registry 등록 완료")
+                    return True
                 else:
-                    print(f"⚠️ 등록 시도 {attempt + 1}/{max_retries} 실패 (HTTP {response.status_code})")
-                    if attempt < max_retries - 1:
-                        print(f"   {retry_delay}초 후 재시도...")
-                        await asyncio.sleep(retry_delay)
-                        continue
-                    else:
-                        print(f"❌ Weather Agent Registry 등록 최종 실패")
-                        return False
-                        
+                    logger.error("❌ Weather Agent Registry 등록 실패: %s", result.get('message', 'Unknown error'))
+                    return False
+            else:
+                logger.warning("⚠️ 등록 시도 %d/%d 실패 (HTTP %d)", attempt + 1, max_retries, response.status_code)
+                if attempt < max_retries - 1:
+                    logger.info("   %.1f초 후 재시도...", backoff)
+                    await asyncio.sleep(backoff)
+                    continue
+                else:
+                    logger.error("❌ Weather Agent Registry 등록 최종 실패")
+                    return False
+
         except Exception as e:
-            print(f"⚠️ 등록 시도 {attempt + 1}/{max_retries} 오류: {e}")
+            logger.warning("⚠️ 등록 시도 %d/%d 오류: %s", attempt + 1, max_retries, e)
             if attempt < max_retries - 1:
-                print(f"   {retry_delay}초 후 재시도...")
-                await asyncio.sleep(retry_delay)
+                logger.info("   %.1f초 후 재시도...", backoff)
+                await asyncio.sleep(backoff)
                 continue
             else:
-                print(f"❌ Weather Agent Registry 등록 최종 실패: {e}")
+                logger.error("❌ Weather Agent Registry 등록 최종 실패: %s", e)
                 return False
-    
+
     return False
 
 
+# Agent Card는 프로세스 내에서 완전히 정적이므로 모듈 로드 시 한 번만 구성
+_AGENT_CARD = AgentCard(
+    name="Weather Agent",
+    description="날씨 정보 제공 전담 에이전트 - A2A 프로토콜 지원",
+    version="1.0.0",
+    url="http://localhost:18001",
+    capabilities={
+        "streaming": False,
+        "pushNotifications": False,
+        "stateTransitionHistory": False
+    },
+    defaultInputModes=["text"],
+    defaultOutputModes=["text"],
+    skills=[
+        AgentSkill(
+            id="weather",
+            name="Weather Service",
+            description="날씨 정보 및 예보 제공 통합 서비스",
+            tags=["weather", "info", "forecast", "temperature", "condition"]
+        )
+    ]
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _extended_agent_card() -> dict:
+    """등록용 확장 Agent Card dict 구성 (내용이 정적이라 1회만 계산)
+
+    model_dump()와 ExtendedAgentSkill 조립은 싸지 않으므로
+    앱이 여러 번 기동/등록되더라도 결과를 재사용한다.
+    """
+    card = _AGENT_CARD.model_dump()
+    card["extended_skills"] = [
+        ExtendedAgentSkill(
+            id="weather",
+            name="Weather Service",
+            description="날씨 정보 및 예보 제공 통합 서비스",
+            tags=["weather", "info", "forecast", "temperature", "condition"],
+            domain_category="weather",
+            keywords=["날씨", "weather", "기온", "온도", "비", "눈", "맑음", "흐림", "바람", "습도", "예보"],
+            entity_types=[
+                EntityTypeInfo("location", "위치 정보", ["서울", "부산", "대구", "인천", "광주", "대전", "울산", "제주"]),
+                EntityTypeInfo("time", "시간 정보", ["오늘", "내일", "이번주", "다음주", "지금", "현재", "모레", "주말", "평일"])
+            ],
+            intent_patterns=["날씨 문의", "기상 정보", "날씨 예보", "weather inquiry", "weather forecast"],
+            connection_patterns=["어울리는", "맞는", "적절한", "따라", "기반으로", "맞춰서"]
+        ).to_dict()
+    ]
+    return card
+
+
 def create_weather_agent():
     """Weather Agent 생성"""
-    print("🏗️ Weather Agent 생성...")
-    
-    agent_card = AgentCard(
-        name="Weather Agent",
-        description="날씨 정보 제공 전담 에이전트 - A2A 프로토콜 지원",
-        version="1.0.0",
-        url="http://localhost:18001",
-        capabilities={
-            "streaming": False,
-            "pushNotifications": False,
-            "stateTransitionHistory": False
-        },
-        defaultInputModes=["text"],
-        defaultOutputModes=["text"],
-        skills=[
-            AgentSkill(
-                id="weather",
-                name="Weather Service",
-                description="날씨 정보 및 예보 제공 통합 서비스",
-                tags=["weather", "info", "forecast", "temperature", "condition"]
-            )
-        ]
-    )
-    
+    logger.info("🏗️ Weather Agent 생성...")
+
     executor = WeatherAgentExecutor()
     task_store = InMemoryTaskStore()
     request_handler = DefaultRequestHandler(
@@ -456,34 +682,29 @@ def create_weather_agent():
         task_store=task_store
     )
     app_builder = A2AStarletteApplication(
-        agent_card=agent_card,
+        agent_card=_AGENT_CARD,
         http_handler=request_handler
     )
     
     app = app_builder.build()
-    print("✅ Weather Agent 생성 완료")
+    logger.info("✅ Weather Agent 생성 완료")
     
     # 서버 시작 이벤트에 등록 함수 추가
     @app.on_event("startup")
     async def startup_event():
-        # 확장된 정보를 포함하여 등록
-        extended_agent_card = agent_card.model_dump()
-        extended_agent_card["extended_skills"] = [
-            ExtendedAgentSkill(
-                id="weather",
-                name="Weather Service",
-                description="날씨 정보 및 예보 제공 통합 서비스",
-                tags=["weather", "info", "forecast", "temperature", "condition"],
-                domain_category="weather",
-                keywords=["날씨", "weather", "기온", "온도", "비", "눈", "맑음", "흐림", "바람", "습도", "예보"],
-                entity_types=[
-                    EntityTypeInfo("location", "위치 정보", ["서울", "부산", "대구", "인천", "광주", "대전", "울산", "제주"]),
-                    EntityTypeInfo("time", "시간 정보", ["오늘", "내일", "이번주", "다음주", "지금", "현재", "모레", "주말", "평일"])
-                ],
-                intent_patterns=["날씨 문의", "기상 정보", "날씨 예보", "weather inquiry", "weather forecast"],
-                connection_patterns=["어울리는", "맞는", "적절한", "따라", "기반으로", "맞춰서"]
-            ).to_dict()
-        ]
-        await register_to_main_agent(extended_agent_card)
-    
+        # 프로세스 수명 동안 재사용할 공유 httpx 클라이언트 (keepalive 풀 유지)
+        app.state.http = httpx.AsyncClient(
+            timeout=10.0,
+            limits=_HTTP_POOL_LIMITS
+        )
+        executor.http_client = app.state.http
+
+        # 확장된 정보를 포함하여 등록 (카드 dict는 메모이즈된 빌더에서 재사용)
+        await register_to_main_agent(_extended_agent_card(), client=app.state.http)
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        # 공유 클라이언트 정리
+        await app.state.http.aclose()
+
     return app
\ No newline at end of file